@@ -1,37 +1,99 @@
 import streamlit as st
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
+import lxml.html
 import io
+import itertools
+import json
+import os
 import math
 import numpy as np
 import random
-import time
-from scipy.stats import norm, poisson, skellam
-from scipy.optimize import minimize
+from concurrent.futures import ThreadPoolExecutor
+from scipy.stats import norm
+from scipy.special import pdtr, pdtrc
+from scipy.optimize import brentq, root_scalar
+from numba import njit
 
 #Set page title and icon
 st.set_page_config(page_title="BetWise", page_icon=":soccer:")
 
-# Calculate 1x2 and xG
-def calculate_1x2_and_xg(home_xg, away_xg, max_goals=10):
-    if home_xg < 0 or away_xg < 0:
-        raise ValueError("Invalid inputs: xG values must be non-negative")
-
-    # Calculate probabilities using Poisson distribution
+# Poisson pmf for k = 0..n via the recurrence p[k] = p[k-1] * lam / k
+@njit(cache=True, fastmath=True)
+def _poisson_pmf_small(lam, n):
+    out = np.empty(n + 1)
+    out[0] = math.exp(-lam)
+    for k in range(1, n + 1):
+        out[k] = out[k - 1] * lam / k
+    return out
+
+# Home win, draw and away win probabilities from the truncated Poisson score grid
+@njit(cache=True, fastmath=True)
+def _probs_from_xg(home_xg, away_xg, max_goals):
+    ph = _poisson_pmf_small(home_xg, max_goals)
+    pa = _poisson_pmf_small(away_xg, max_goals)
     p_home_win = 0.0
     p_draw = 0.0
     p_away_win = 0.0
-
     for home_goals in range(max_goals + 1):
         for away_goals in range(max_goals + 1):
-            p = poisson.pmf(home_goals,home_xg) * poisson.pmf(away_goals, away_xg)
+            p = ph[home_goals] * pa[away_goals]
             if home_goals > away_goals:
                 p_home_win += p
             elif home_goals == away_goals:
                 p_draw += p
             else:
                 p_away_win += p
+    return p_home_win, p_draw, p_away_win
+
+# Model's home DNB probability, P(home > away | home != away), with lambda_a = total_xg - lambda_h,
+# and its analytic derivative with respect to lambda_h
+@njit(cache=True, fastmath=True)
+def _model_h_dnb(lambda_h, total_xg):
+    n = 15
+    ph = _poisson_pmf_small(lambda_h, n)
+    pa = _poisson_pmf_small(total_xg - lambda_h, n)
+
+    # d/dlambda p[k] = p[k-1] - p[k]; lambda_a moves opposite to lambda_h
+    dph = np.empty(n + 1)
+    dpa = np.empty(n + 1)
+    dph[0] = -ph[0]
+    dpa[0] = pa[0]
+    for k in range(1, n + 1):
+        dph[k] = ph[k - 1] - ph[k]
+        dpa[k] = pa[k] - pa[k - 1]
+
+    home_win_prob = 0.0
+    away_win_prob = 0.0
+    d_home_win_prob = 0.0
+    d_away_win_prob = 0.0
+    for home_goals in range(n + 1):
+        for away_goals in range(n + 1):
+            p = ph[home_goals] * pa[away_goals]
+            dp = dph[home_goals] * pa[away_goals] + ph[home_goals] * dpa[away_goals]
+            if home_goals > away_goals:
+                home_win_prob += p
+                d_home_win_prob += dp
+            elif home_goals < away_goals:
+                away_win_prob += p
+                d_away_win_prob += dp
+
+    total = home_win_prob + away_win_prob
+    model_h_dnb = home_win_prob / total
+    d_model_h_dnb = (d_home_win_prob * away_win_prob - home_win_prob * d_away_win_prob) / (total * total)
+    return model_h_dnb, d_model_h_dnb
+
+# Calculate 1x2 and xG
+def calculate_1x2_and_xg(home_xg, away_xg, max_goals=None):
+    if home_xg < 0 or away_xg < 0:
+        raise ValueError("Invalid inputs: xG values must be non-negative")
+
+    # Size the score grid to the xG values: smaller for low-scoring matches, wider for high xG
+    if max_goals is None:
+        max_goals = max(8, int(3 * max(home_xg, away_xg) + 5))
+
+    # Calculate probabilities using Poisson distribution
+    p_home_win, p_draw, p_away_win = _probs_from_xg(float(home_xg), float(away_xg), int(max_goals))
 
     # Normalize to ensure probabilities sum to 1 (due to truncation)
     total = p_home_win + p_draw + p_away_win
@@ -50,7 +112,7 @@ def calculate_xg_from_dnb_probs(home_dnb_prob, away_dnb_prob, total_xg, max_iter
         home_dnb_prob (float): Probability of home win (draws excluded) [0-1]
         away_dnb_prob (float): Probability of away win (draws excluded) [0-1]
         total_xg (float): Total expected goals in the match
-        max_iter (int): Maximum optimization iterations
+        max_iter (int): Maximum root-finding iterations
 
     Returns:
         tuple: (home_xg, away_xg)
@@ -59,174 +121,58 @@ def calculate_xg_from_dnb_probs(home_dnb_prob, away_dnb_prob, total_xg, max_iter
     if not np.isclose(home_dnb_prob + away_dnb_prob, 1.0, atol=1e-4):
         raise ValueError("DNB probabilities must sum to 1")
 
-    def objective(lambda_h):
-        lambda_a = total_xg - lambda_h
-
-        if lambda_h <= 1e-5 or lambda_a <= 1e-5:
-            return 1e9  # Penalize invalid values
+    lower = 1e-5
+    upper = total_xg - 1e-5
 
-        # Calculate outcome probabilities using Skellam distribution
-        home_win_prob = 1 - skellam.cdf(0, lambda_h, lambda_a)
-        draw_prob = skellam.pmf(0, lambda_h, lambda_a)
+    # The model's home DNB probability increases monotonically with lambda_h,
+    # so solve model_h_dnb(lambda_h) = home_dnb_prob directly
+    def residual(lambda_h):
+        model_h_dnb, d_model_h_dnb = _model_h_dnb(float(lambda_h), float(total_xg))
+        return model_h_dnb - home_dnb_prob, d_model_h_dnb
 
-        # Avoid division by zero in extreme cases
-        if draw_prob >= 1 - 1e-5:
-            return 1e9
-
-        # Calculate model's DNB probabilities
-        model_h_dnb = home_win_prob / (1 - draw_prob)
-        model_a_dnb = (1 - draw_prob - home_win_prob) / (1 - draw_prob) # Corrected away DNB prob
-
-        # Calculate error (squared differences)
-        error = (model_h_dnb - home_dnb_prob)**2 + (model_a_dnb - away_dnb_prob)**2
-        return error
-
-    # Initial guess based on DNB probabilities
-    initial_guess = total_xg * home_dnb_prob
-    bounds = [(1e-5, total_xg - 1e-5)]
-
-    # Numerical optimization
-    result = minimize(objective,
-                     x0=initial_guess,
-                     method='L-BFGS-B',
-                     bounds=bounds,
-                     options={'maxiter': max_iter})
-
-    if not result.success:
-        raise ValueError(f"Optimization failed: {result.message}")
-
-    home_xg = round(result.x[0], 4)
+    # Newton's method with the analytic derivative, starting from the DNB-weighted split
+    try:
+        result = root_scalar(residual,
+                             x0=total_xg * home_dnb_prob,
+                             fprime=True,
+                             method='newton',
+                             xtol=1e-6,
+                             maxiter=max_iter)
+        root = result.root if result.converged else np.nan
+    except ArithmeticError:
+        root = np.nan  # Newton stepped outside the valid domain
+
+    # Fall back to Brent's method on the full bracket if Newton fails or leaves it
+    if not np.isfinite(root) or not lower <= root <= upper:
+        lower_residual = residual(lower)[0]
+        upper_residual = residual(upper)[0]
+        if lower_residual * upper_residual > 0:
+            # Target is out of the model's reach on the bracket; clamp to the nearer bound
+            root = lower if abs(lower_residual) <= abs(upper_residual) else upper
+        else:
+            root, result = brentq(lambda lambda_h: residual(lambda_h)[0],
+                                  lower,
+                                  upper,
+                                  xtol=1e-6,
+                                  maxiter=max_iter,
+                                  full_output=True,
+                                  disp=False)
+
+            if not result.converged:
+                raise ValueError(f"Root finding failed: {result.flag}")
+
+    home_xg = round(root, 4)
     away_xg = round(total_xg - home_xg, 4)
     return home_xg, away_xg
 
 
-#Dictionaries of country and leagues
-leagues_dict = {
-    "England": ["UK1", "UK2", "UK3", "UK4", "UK5", "UK6N", "UK6S", "UK7N"],
-    "Germany": ["DE1", "DE2", "DE3", "DE4SW", "DE4W", "DE4N", "DE4NO", "DE4B"],
-    "Italy": ["IT1", "IT2", "IT3C", "IT3B", "IT3A"],
-    "Spain": ["ES1", "ES2", "ES3G1", "ES3G2", "ES3G3", "ES3G4", "ES3G5"],
-    "France": ["FR1", "FR2", "FR3"],
-    "Sweden": ["SW1", "SW2", "SW3S", "SW3N"],
-    "Netherlands": ["NL1", "NL2", "NL3"],
-    "Russia": ["RU1", "RU2"],
-    "Portugal": ["PT1", "PT2"],
-    "Austria": ["AT1", "AT2", "AT3O", "AT3T", "AT3M", "AT3W", "AT3V"],
-    "Denmark": ["DK1", "DK2", "DK3G1", "DK3G2"],
-    "Greece": ["GR1", "GR2"],
-    "Norway": ["NO1", "NO2", "NO3G1", "NO3G2"],
-    "Czech-Republic": ["CZ1", "CZ2"],
-    "Turkey": ["TU1", "TU2", "TU3B", "TU3K"],
-    "Belgium": ["BE1", "BE2"],
-    "Scotland": ["SC1", "SC2", "SC3", "SC4"],
-    "Switzerland": ["CH1", "CH2"],
-    "Finland": ["FI1", "FI2", "FI3A", "FI3B", "FI3C"],
-    "Ukraine": ["UA1", "UA2"],
-    "Romania": ["RO1", "RO2"],
-    "Poland": ["PL1", "PL2", "PL3"],
-    "Croatia": ["HR1", "HR2"],
-    "Belarus": ["BY1", "BY2"],
-    "Israel": ["IL1", "IL2"],
-    "Iceland": ["IS1", "IS2", "IS3", "IS4"],
-    "Cyprus": ["CY1", "CY2"],
-    "Serbia": ["CS1", "CS2"],
-    "Bulgaria": ["BG1", "BG2"],
-    "Slovakia": ["SK1", "SK2"],
-    "Hungary": ["HU1", "HU2"],
-    "Kazakhstan": ["KZ1", "KZ2"],
-    "Bosnia-Herzegovina": ["BA1"],
-    "Slovenia": ["SI1", "SI2"],
-    "Azerbaijan": ["AZ1"],
-    "Ireland": ["IR1", "IR2"],
-    "Latvia": ["LA1", "LA2"],
-    "Georgia": ["GE1", "GE2"],
-    "Kosovo": ["XK1"],
-    "Albania": ["AL1"],
-    "Lithuania": ["LT1", "LT2"],
-    "North-Macedonia": ["MK1"],
-    "Armenia": ["AM1"],
-    "Estonia": ["EE1", "EE2"],
-    "Northern-Ireland": ["NI1", "NI2"],
-    "Malta": ["MT1"],
-    "Luxembourg": ["LU1"],
-    "Wales": ["WL1"],
-    "Montenegro": ["MN1"],
-    "Moldova": ["MD1"],
-    "Färöer": ["FA1"],
-    "Gibraltar": ["GI1"],
-    "Andorra": ["AD1"],
-    "San-Marino": ["SM1"],
-    "Brazil": ["BR1", "BR2", "BR3", "BRC", "BRGA"],
-    "Mexico": ["MX1", "MX2"],
-    "Argentina": ["AR1", "AR2", "AR3F", "AR5", "AR3", "AR4"],
-    "USA": ["US1", "US2", "US3"],
-    "Colombia": ["CO1", "CO2"],
-    "Ecuador": ["EC1", "EC2"],
-    "Paraguay": ["PY1", "PY2"],
-    "Chile": ["CL1", "CL2"],
-    "Uruguay": ["UY1", "UY2"],
-    "Costa-Rica": ["CR1", "CR2"],
-    "Bolivia": ["BO1"],
-    "Guatemala": ["GT1", "GT2"],
-    "Dominican-Rep.": ["DO1"],
-    "Honduras": ["HN1"],
-    "Venezuela": ["VE1"],
-    "Peru": ["PE1", "PE2"],
-    "Panama": ["PA1"],
-    "El-Salvador": ["SV1"],
-    "Jamaica": ["JM1"],
-    "Nicaragua": ["NC1"],
-    "Canada": ["CA1"],
-    "Haiti": ["HT1"],
-    "Japan": ["JP1", "JP2", "JP3"],
-    "South-Korea": ["KR1", "KR2", "KR3"],
-    "China": ["CN1", "CN2", "CN3"],
-    "Iran": ["IA1", "IA2"],
-    "Australia": ["AU1", "AU2V", "AU2NSW", "AU2Q", "AU2S", "AU2W"],
-    "Saudi-Arabia": ["SA1", "SA2"],
-    "Thailand": ["TH1", "TH2"],
-    "Qatar": ["QA1", "QA2"],
-    "United-Arab-Emirates": ["AE1", "AE2"],
-    "Indonesia": ["ID1", "ID2"],
-    "Jordan": ["JO1"],
-    "Syria": ["SY1"],
-    "Uzbekistan": ["UZ1"],
-    "Malaysia": ["MY1", "MY2"],
-    "Vietnam": ["VN1", "VN2"],
-    "Iraq": ["IQ1"],
-    "Kuwait": ["KW1"],
-    "Bahrain": ["BH1"],
-    "Myanmar": ["MM1"],
-    "Palestine": ["PS1"],
-    "India": ["IN1", "IN2"],
-    "New-Zealand": ["NZ1"],
-    "Hong-Kong": ["HK1", "HK2"],
-    "Oman": ["OM1"],
-    "Taiwan": ["TW1"],
-    "Tajikistan": ["TJ1"],
-    "Turkmenistan": ["TM1"],
-    "Lebanon": ["LB1"],
-    "Bangladesh": ["BD1"],
-    "Singapore": ["SG1"],
-    "Cambodia": ["KH1"],
-    "Kyrgyzstan": ["KG1"],
-    "Egypt": ["EG1", "EG2"],
-    "Algeria": ["DZ1", "DZ2"],
-    "Tunisia": ["TN1", "TN2"],
-    "Morocco": ["MA1", "MA2"],
-    "South-Africa": ["ZA1", "ZA2"],
-    "Kenya": ["KE1", "KE2"],
-    "Zambia": ["ZM1"],
-    "Ghana": ["GH1"],
-    "Nigeria": ["NG1"],
-    "Uganda": ["UG1"],
-    "Burundi": ["BI1"],
-    "Rwanda": ["RW1"],
-    "Cameroon": ["CM1"],
-    "Tanzania": ["TZ1"],
-    "Gambia": ["GM1"],
-    "Sudan": ["SD1"]
-}
+#Dictionaries of country and leagues, loaded once per process from leagues.json
+@st.cache_resource
+def _load_leagues():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "leagues.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+leagues_dict = _load_leagues()
 
 # List of spinner messages
 spinner_messages = [
@@ -237,38 +183,105 @@ spinner_messages = [
     "Almost there, preparing the stats..."
 ]
 
+# Shared HTTP session, kept across Streamlit reruns so keep-alive connections are reused
+@st.cache_resource
+def _get_http_session():
+    session = requests.Session()
+    session.headers["User-Agent"] = "Mozilla/5.0"
+    return session
+
+# Parse a single lxml table element into a DataFrame
+def _parse_html_table(table):
+    table_html = lxml.html.tostring(table, with_tail=False)
+    return pd.read_html(io.BytesIO(table_html), flavor="lxml")[0]
+
+# Parse table elements one at a time, skipping those pd.read_html would drop (no rows)
+def _iter_parsed_tables(tables):
+    for table in tables:
+        try:
+            parsed = _parse_html_table(table)
+        except (ValueError, IndexError):
+            continue
+        yield parsed
+
+# Fetch and parse the rating and league tables; cached so repeated selections skip the network
+# (errors propagate so failed fetches are not cached)
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_tables(country, league, table_type):
+    url = f"https://www.soccer-rating.com/{country}/{league}/{table_type}/"
+    response = _get_http_session().get(url, timeout=10)
+    response.raise_for_status()
+    # Decode with the charset from the HTTP headers (as response.text does), not the page markup
+    parser = lxml.html.HTMLParser(encoding=response.encoding or "utf-8")
+    tree = lxml.html.fromstring(response.content, parser=parser)
+    # Candidate tables: those with text that are not inside a display:none element. This is only a
+    # pre-filter; pd.read_html also drops tables that parse to no rows, which needs a parse to detect
+    tables = tree.xpath("//table[.//text()[re:test(., '.+')]]"
+                        "[not(ancestor-or-self::*[contains(translate(@style, ' ', ''), 'display:none')])]",
+                        namespaces={"re": "http://exslt.org/regular-expressions"})
+
+    # Parse lazily in document order, numbering only the tables pd.read_html would keep, so the
+    # indices below point at the same tables as before; stop once index 28 has been reached
+    parsed_tables = _iter_parsed_tables(tables)
+    head_tables = list(itertools.islice(parsed_tables, 29))
+
+    # Get the rating table as before (using table index 14)
+    rating_table = head_tables[14] if len(head_tables) > 14 else None
+
+    # Expected columns for the league table
+    expected_columns = {"Home", "Away", "Home.4", "Away.4"}
+    possible_indices = [28, 24, 23]
+    league_table = None
+    for idx in possible_indices:
+        if len(head_tables) > idx:
+            candidate = head_tables[idx]
+            candidate_cols = set(candidate.columns.astype(str))
+            if expected_columns.issubset(candidate_cols):
+                league_table = candidate
+                break
+    # Fallback: search all tables for expected columns, parsing the rest of the page only if needed
+    if league_table is None:
+        for candidate in itertools.chain(head_tables, parsed_tables):
+            candidate_cols = set(candidate.columns.astype(str))
+            if expected_columns.issubset(candidate_cols):
+                league_table = candidate
+                break
+    return rating_table, league_table
+
+# Split a column of "GF:GA" strings into numeric goals-for and goals-against series
+def _split_goals(goals):
+    goals = goals.astype(str)
+    parts = goals.str.split(":", n=1, expand=True)
+    if parts.shape[1] < 2:
+        missing = pd.Series(np.nan, index=goals.index)
+        return missing, missing.copy()
+    has_separator = goals.str.contains(":", regex=False)
+    goals_for = pd.to_numeric(parts[0].str.strip(), errors="coerce").where(has_separator)
+    goals_against = pd.to_numeric(parts[1].str.strip(), errors="coerce").where(has_separator)
+    return goals_for, goals_against
+
+# Add derived goal columns to the league table once per fetch instead of on every rerun
+@st.cache_data(show_spinner=False)
+def _preprocess_league_table(league_table):
+    league_table = league_table.copy()
+    if "Goals" in league_table.columns:
+        league_table["GF"], league_table["GA"] = _split_goals(league_table["Goals"])
+    # Home and away goal pairs (format "GF:GA")
+    if "Home.4" in league_table.columns:
+        league_table["HomeGF"], league_table["HomeGA"] = _split_goals(league_table["Home.4"])
+    if "Away.4" in league_table.columns:
+        league_table["AwayGF"], league_table["AwayGA"] = _split_goals(league_table["Away.4"])
+    return league_table
+
+# Team name -> rating lookup; the first row wins for duplicate team names
+def _ratings_lookup(rating_table):
+    rating_table = rating_table.drop_duplicates(subset=rating_table.columns[0])
+    return dict(zip(rating_table.iloc[:, 0], rating_table.iloc[:, 1]))
+
 # Function to fetch table from website
 def fetch_table(country, league, table_type="home"):
-    url = f"https://www.soccer-rating.com/{country}/{league}/{table_type}/"
     try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "lxml")
-        html_io = io.StringIO(str(soup))
-        tables = pd.read_html(html_io, flavor="lxml")
-
-        # Get the rating table as before (using table index 14)
-        rating_table = tables[14] if tables and len(tables) > 14 else None
-
-        # Expected columns for the league table
-        expected_columns = {"Home", "Away", "Home.4", "Away.4"}
-        possible_indices = [28, 24, 23]
-        league_table = None
-        for idx in possible_indices:
-            if tables and len(tables) > idx:
-                candidate = tables[idx]
-                candidate_cols = set(candidate.columns.astype(str))
-                if expected_columns.issubset(candidate_cols):
-                    league_table = candidate
-                    break
-        # Fallback: search all tables for expected columns
-        if league_table is None:
-            for candidate in tables:
-                candidate_cols = set(candidate.columns.astype(str))
-                if expected_columns.issubset(candidate_cols):
-                    league_table = candidate
-                    break
-        return rating_table, league_table
+        return _fetch_tables(country, league, table_type)
     except Exception as e:
         return None, None
 
@@ -379,25 +392,32 @@ selected_league = st.sidebar.selectbox("Select League:", leagues_dict[selected_c
 tab1, tab2 = st.tabs(["Elo Ratings Odds Calculator", "League Table"])
 
 with tab1:
-    # Create a progress bar
-    progress_bar = st.progress(0)
-
     # Fetch data if not available or league has changed
     if "home_table" not in st.session_state or "away_table" not in st.session_state or st.session_state.get("selected_league") != selected_league:
         if st.sidebar.button("Get Ratings", key="fetch_button", help="Fetch ratings and tables for selected country and league"):
             with st.spinner(random.choice(spinner_messages)):
-                for i in range(100):  # Simulate progress
-                    time.sleep(0.05)
-                    progress_bar.progress(i + 1)
-                home_table, home_league_table = fetch_table(selected_country, selected_league, "home")
-                away_table, away_league_table = fetch_table(selected_country, selected_league, "away")
-                progress_bar.empty()
+                # Fetch home and away tables concurrently
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    home_future = executor.submit(fetch_table, selected_country, selected_league, "home")
+                    away_future = executor.submit(fetch_table, selected_country, selected_league, "away")
+                    home_table, home_league_table = home_future.result()
+                    away_table, away_league_table = away_future.result()
                 if isinstance(home_table, pd.DataFrame) and isinstance(away_table, pd.DataFrame):
                     home_table = home_table.drop(home_table.columns[[0, 2, 3]], axis=1)
                     away_table = away_table.drop(away_table.columns[[0, 2, 3]], axis=1)
                     st.session_state["home_table"] = home_table
                     st.session_state["away_table"] = away_table
-                    st.session_state["league_table"] = home_league_table  # Store the league table
+                    # Team name -> rating lookups
+                    st.session_state["home_ratings"] = _ratings_lookup(home_table)
+                    st.session_state["away_ratings"] = _ratings_lookup(away_table)
+                    # Store the league table, plus a team name -> row lookup
+                    league_table = _preprocess_league_table(home_league_table) if home_league_table is not None else None
+                    st.session_state["league_table"] = league_table
+                    if league_table is not None:
+                        team_column = league_table.columns[1]
+                        st.session_state["league_rows"] = league_table.drop_duplicates(subset=team_column).set_index(team_column).to_dict("index")
+                    else:
+                        st.session_state["league_rows"] = None
                     st.session_state["selected_league"] = selected_league
                     st.success("Data fetched successfully!")
                 else:
@@ -412,11 +432,13 @@ with tab1:
         with col2:
             away_team = st.selectbox("Select Away Team:", st.session_state["away_table"].iloc[:, 0])
 
-        # Fetch team ratings
-        home_team_data = st.session_state["home_table"][st.session_state["home_table"].iloc[:, 0] == home_team]
-        away_team_data = st.session_state["away_table"][st.session_state["away_table"].iloc[:, 0] == away_team]
-        home_rating = home_team_data.iloc[0, 1]
-        away_rating = away_team_data.iloc[0, 1]
+        # Fetch team ratings (build the lookups if this session's tables predate them)
+        if "home_ratings" not in st.session_state:
+            st.session_state["home_ratings"] = _ratings_lookup(st.session_state["home_table"])
+        if "away_ratings" not in st.session_state:
+            st.session_state["away_ratings"] = _ratings_lookup(st.session_state["away_table"])
+        home_rating = st.session_state["home_ratings"][home_team]
+        away_rating = st.session_state["away_ratings"][away_team]
         home = 10**(home_rating / 400)
         away = 10**(away_rating / 400)
         home_win_prob_raw = home / (home + away)
@@ -457,47 +479,34 @@ with tab1:
         away_goals_for_per_game = None
         away_goals_against_per_game = None
 
-        # Helper function to extract goals (format "GF:GA")
-        def extract_goals_parts(value):
-            try:
-                parts = value.split(":")
-                if len(parts) >= 2:
-                    goals_for = float(parts[0].strip())
-                    goals_against = float(parts[1].strip())
-                    return goals_for, goals_against
-                else:
-                    return None, None
-            except Exception as e:
-                return None, None
-
         # Calculate goals statistics from league table if available
-        if "league_table" in st.session_state and st.session_state["league_table"] is not None:
-            league_table = st.session_state["league_table"]
+        if st.session_state.get("league_rows") is not None:
+            league_rows = st.session_state["league_rows"]
             # Home team stats
-            home_team_row = league_table[league_table.iloc[:, 1] == home_team]
-            if not home_team_row.empty:
-                home_raw = home_team_row.iloc[0]["Home.4"]
-                home_goals_for, home_goals_against = extract_goals_parts(home_raw)
+            home_team_row = league_rows.get(home_team)
+            if home_team_row is not None:
+                home_goals_for = home_team_row["HomeGF"]
+                home_goals_against = home_team_row["HomeGA"]
                 try:
-                    home_games = float(home_team_row.iloc[0]["Home"])
+                    home_games = float(home_team_row["Home"])
                     if home_games and home_games != 0:
-                        if home_goals_for is not None:
+                        if pd.notna(home_goals_for):
                             home_goals_for_per_game = home_goals_for / home_games
-                        if home_goals_against is not None:
+                        if pd.notna(home_goals_against):
                             home_goals_against_per_game = home_goals_against / home_games
                 except Exception as e:
                     pass
             # Away team stats
-            away_team_row = league_table[league_table.iloc[:, 1] == away_team]
-            if not away_team_row.empty:
-                away_raw = away_team_row.iloc[0]["Away.4"]
-                away_goals_for, away_goals_against = extract_goals_parts(away_raw)
+            away_team_row = league_rows.get(away_team)
+            if away_team_row is not None:
+                away_goals_for = away_team_row["AwayGF"]
+                away_goals_against = away_team_row["AwayGA"]
                 try:
-                    away_games = float(away_team_row.iloc[0]["Away"])
+                    away_games = float(away_team_row["Away"])
                     if away_games and away_games != 0:
-                        if away_goals_for is not None:
+                        if pd.notna(away_goals_for):
                             away_goals_for_per_game = away_goals_for / away_games
-                        if away_goals_against is not None:
+                        if pd.notna(away_goals_against):
                             away_goals_against_per_game = away_goals_against / away_games
                 except Exception as e:
                     pass
@@ -506,8 +515,6 @@ with tab1:
         if "league_table" in st.session_state and st.session_state["league_table"] is not None:
             league_table = st.session_state["league_table"]
             if "Goals" in league_table.columns and "M" in league_table.columns:
-                league_table["GF"] = league_table["Goals"].apply(lambda x: float(x.split(":")[0].strip()) if isinstance(x, str) and ":" in x else None)
-                league_table["GA"] = league_table["Goals"].apply(lambda x: float(x.split(":")[1].strip()) if isinstance(x, str) and ":" in x else None)
                 avg_GF = league_table["GF"].mean()
                 avg_GA = league_table["GA"].mean()
                 avg_total = (league_table["GF"] + league_table["GA"]).mean()
@@ -551,8 +558,8 @@ with tab1:
                 draw_odds_poisson = 1 / p_draw if p_draw > 0 else float('inf')
                 away_odds_poisson = 1 / p_away_win if p_away_win > 0 else float('inf')
                
-                p_under_25 = poisson.cdf(2, total_expected_goals)
-                p_over_25 = 1 - p_under_25
+                p_under_25 = pdtr(2, total_expected_goals)
+                p_over_25 = pdtrc(2, total_expected_goals)
                 over_odds_poisson = 1 / p_over_25 if p_over_25 > 0 else float('inf')
                 under_odds_poisson = 1 / p_under_25 if p_under_25 > 0 else float('inf')
 